@@ -2,6 +2,7 @@
 账户管理模块 - 管理多个交易账户和资金分配
 """
 import asyncio
+from collections import defaultdict
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
 import logging
@@ -27,6 +28,13 @@ class AccountManager:
         self.accounts: Dict[str, Account] = {}
         self.logger = logging.getLogger("account_manager")
         
+        # 增量维护的汇总数据
+        self._total_balance: Dict[str, float] = defaultdict(float)
+        self._total_positions: Dict[str, float] = defaultdict(float)
+        self._balance_sum: Dict[str, float] = {}  # 账户总余额
+        self._position_abs_sum: Dict[str, float] = {}  # 账户持仓绝对值之和
+        self._active_cache: Optional[List[Account]] = None  # 活跃账户缓存
+        
         # 初始化账户
         self._initialize_accounts()
     
@@ -48,6 +56,24 @@ class AccountManager:
             
             self.accounts[account.account_id] = account
             self.logger.info(f"初始化账户: {account.account_id}")
+        
+        self._rebuild_totals()
+        self._active_cache = [acc for acc in self.accounts.values() if acc.is_active]
+    
+    def _rebuild_totals(self):
+        """重建汇总缓存"""
+        self._total_balance.clear()
+        self._total_positions.clear()
+        self._balance_sum.clear()
+        self._position_abs_sum.clear()
+        
+        for account in self.accounts.values():
+            for currency, balance in account.balance.items():
+                self._total_balance[currency] += balance
+            for ticker, position in account.positions.items():
+                self._total_positions[ticker] += position
+            self._balance_sum[account.account_id] = sum(account.balance.values())
+            self._position_abs_sum[account.account_id] = sum(abs(pos) for pos in account.positions.values())
     
     def get_account(self, account_id: str) -> Optional[Account]:
         """获取账户信息"""
@@ -55,18 +81,38 @@ class AccountManager:
     
     def get_active_accounts(self) -> List[Account]:
         """获取活跃账户列表"""
-        return [acc for acc in self.accounts.values() if acc.is_active]
+        if self._active_cache is None:
+            self._active_cache = [acc for acc in self.accounts.values() if acc.is_active]
+        return self._active_cache
+    
+    def set_account_active(self, account_id: str, is_active: bool):
+        """启用或停用账户"""
+        account = self.accounts.get(account_id)
+        if account and account.is_active != is_active:
+            account.is_active = is_active
+            self._active_cache = None
+            self.logger.info(f"账户 {account_id} {'已启用' if is_active else '已停用'}")
     
     async def update_account_balance(self, account_id: str, balance_data: Dict[str, float]):
         """更新账户余额"""
         if account_id in self.accounts:
-            self.accounts[account_id].balance.update(balance_data)
+            balance = self.accounts[account_id].balance
+            for currency, new_balance in balance_data.items():
+                delta = new_balance - balance.get(currency, 0)
+                self._total_balance[currency] += delta
+                self._balance_sum[account_id] += delta
+            balance.update(balance_data)
             self.logger.debug(f"更新账户 {account_id} 余额")
     
     async def update_account_positions(self, account_id: str, positions_data: Dict[str, float]):
         """更新账户持仓"""
         if account_id in self.accounts:
-            self.accounts[account_id].positions.update(positions_data)
+            positions = self.accounts[account_id].positions
+            for ticker, new_position in positions_data.items():
+                old_position = positions.get(ticker, 0)
+                self._total_positions[ticker] += new_position - old_position
+                self._position_abs_sum[account_id] += abs(new_position) - abs(old_position)
+            positions.update(positions_data)
             self.logger.debug(f"更新账户 {account_id} 持仓")
     
     def check_risk_limits(self, account_id: str, new_position_size: float, ticker: str) -> bool:
@@ -84,7 +130,7 @@ class AccountManager:
             return False
         
         # 检查风险限制
-        account_value = sum(account.balance.values())
+        account_value = self._balance_sum[account_id]
         position_value = total_position  # 简化计算
         risk_ratio = position_value / account_value if account_value > 0 else 1
         
@@ -106,54 +152,36 @@ class AccountManager:
         if allocation_strategy == "equal":
             # 平均分配
             amount_per_account = total_amount / len(active_accounts)
-            for account in active_accounts:
-                allocation[account.account_id] = amount_per_account
+            allocation = {acc.account_id: amount_per_account for acc in active_accounts}
         
         elif allocation_strategy == "risk_weighted":
             # 根据风险限制加权分配
             total_risk_capacity = sum(acc.risk_limit for acc in active_accounts)
-            for account in active_accounts:
-                weight = account.risk_limit / total_risk_capacity
-                allocation[account.account_id] = total_amount * weight
+            if total_risk_capacity > 0:
+                scale = total_amount / total_risk_capacity
+                allocation = {acc.account_id: acc.risk_limit * scale for acc in active_accounts}
         
         elif allocation_strategy == "balance_weighted":
-            # 根据账户余额加权分配
-            total_balance = sum(sum(acc.balance.values()) for acc in active_accounts)
+            # 根据账户余额加权分配（使用缓存的账户总余额）
+            balances = {acc.account_id: self._balance_sum[acc.account_id] for acc in active_accounts}
+            total_balance = sum(balances.values())
             if total_balance > 0:
-                for account in active_accounts:
-                    account_balance = sum(account.balance.values())
-                    weight = account_balance / total_balance
-                    allocation[account.account_id] = total_amount * weight
+                scale = total_amount / total_balance
+                allocation = {account_id: balance * scale for account_id, balance in balances.items()}
         
         return allocation
     
     def get_account_statistics(self) -> Dict[str, Any]:
         """获取账户统计信息"""
-        stats = {
+        risk_utilization = {}
+        for account_id, account_value in self._balance_sum.items():
+            position_value = self._position_abs_sum[account_id]
+            risk_utilization[account_id] = position_value / account_value if account_value > 0 else 0
+        
+        return {
             'total_accounts': len(self.accounts),
             'active_accounts': len(self.get_active_accounts()),
-            'total_balance': {},
-            'total_positions': {},
-            'risk_utilization': {}
-        }
-        
-        for account in self.accounts.values():
-            # 汇总余额
-            for currency, balance in account.balance.items():
-                if currency not in stats['total_balance']:
-                    stats['total_balance'][currency] = 0
-                stats['total_balance'][currency] += balance
-            
-            # 汇总持仓
-            for ticker, position in account.positions.items():
-                if ticker not in stats['total_positions']:
-                    stats['total_positions'][ticker] = 0
-                stats['total_positions'][ticker] += position
-            
-            # 计算风险利用率
-            account_value = sum(account.balance.values())
-            position_value = sum(abs(pos) for pos in account.positions.values())
-            risk_util = position_value / account_value if account_value > 0 else 0
-            stats['risk_utilization'][account.account_id] = risk_util
-        
-        return stats
\ No newline at end of file
+            'total_balance': dict(self._total_balance),
+            'total_positions': dict(self._total_positions),
+            'risk_utilization': risk_utilization
+        }
\ No newline at end of file
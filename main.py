@@ -25,6 +25,8 @@ async def main():
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
     logger = logging.getLogger("main")
+    trading_engine = None
+    monitoring_system = None
     
     try:
         # 加载配置
@@ -99,19 +101,25 @@ async def main():
         for account in config.get('accounts', []):
             logger.info(f"  账户 {account['account_id']}: 余额 {account['balance']}")
         
-        # 并行运行所有组件
-        await asyncio.gather(
-            trading_engine.start(),
-            monitoring_system.start(),
-            risk_manager_loop(risk_manager),
-            status_reporter(trading_engine, risk_manager, monitoring_system)
-        )
+        # 并行运行所有组件，任一组件异常退出时取消其余组件
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(trading_engine.start())
+            tg.create_task(monitoring_system.start())
+            tg.create_task(risk_manager_loop(risk_manager))
+            tg.create_task(status_reporter(trading_engine, risk_manager, monitoring_system))
         
-    except KeyboardInterrupt:
+    except* (KeyboardInterrupt, asyncio.CancelledError):
         logger.info("收到停止信号，正在关闭系统...")
-    except Exception as e:
-        logger.error(f"系统错误: {e}")
+    except* Exception as eg:
+        # TaskGroup 将子任务异常打包为 ExceptionGroup，逐个记录真实原因
+        for e in eg.exceptions:
+            logger.error(f"系统错误: {e}", exc_info=e)
     finally:
+        # 停止各组件，写出缓冲数据并关闭客户端
+        if trading_engine is not None:
+            await trading_engine.stop()
+        if monitoring_system is not None:
+            await monitoring_system.stop()
         logger.info("系统已停止")
 
 async def risk_manager_loop(risk_manager: RiskManager):
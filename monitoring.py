@@ -4,12 +4,42 @@
 import asyncio
 import logging
 import json
+import time
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
 import sqlite3
+import threading
+import atexit
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import psutil
+
+# 数据库结构版本，记录在 PRAGMA user_version 中
+SCHEMA_VERSION = 1
+
+# 预定义的写入语句，连接级语句缓存可直接复用
+ORDER_SQL = '''
+    INSERT OR REPLACE INTO orders 
+    (order_id, account_id, ticker, side, quantity, price, status, strategy, created_at, filled_at, pnl)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+PERFORMANCE_METRICS_SQL = '''
+    INSERT OR REPLACE INTO performance_metrics 
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+RISK_EVENT_SQL = '''
+    INSERT INTO risk_events 
+    (timestamp, event_type, severity, description, account_id, ticker)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
 @dataclass
 class PerformanceMetrics:
     """性能指标"""
@@ -27,12 +57,52 @@ class DatabaseManager:
     
     def __init__(self, db_path: str = "trading_data.db"):
         self.db_path = Path(db_path)
+        self.logger = logging.getLogger("monitoring_system.database")
+        
+        # 每个线程复用一条长连接
+        self._tls = threading.local()
+        self._all_conns: List[sqlite3.Connection] = []
+        self._conns_lock = threading.Lock()
+        atexit.register(self._close_all)
+        
+        # 写缓冲，由 flush() 定期批量写入
+        self._order_buf = deque()
+        self._metric_buf = deque()
+        self._risk_buf = deque()
+        
         self._init_database()
     
+    def _conn(self) -> sqlite3.Connection:
+        """获取当前线程的数据库连接"""
+        conn = getattr(self._tls, 'conn', None)
+        if conn is None:
+            # 自动提交模式，事务由 flush() 显式控制；退出时由主线程统一关闭
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA temp_store=MEMORY')
+            self._tls.conn = conn
+            with self._conns_lock:
+                self._all_conns.append(conn)
+        return conn
+    
+    def _close_all(self):
+        """关闭所有线程的连接"""
+        with self._conns_lock:
+            conns, self._all_conns = self._all_conns, []
+        for conn in conns:
+            conn.close()
+    
     def _init_database(self):
         """初始化数据库"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._conn()
+        
+        # 结构已是最新版本时跳过建表
+        if conn.execute('PRAGMA user_version').fetchone()[0] == SCHEMA_VERSION:
+            return
+        
         cursor = conn.cursor()
+        cursor.execute('BEGIN IMMEDIATE')
         
         # 创建订单表
         cursor.execute('''
@@ -78,19 +148,17 @@ class DatabaseManager:
             )
         ''')
         
-        conn.commit()
-        conn.close()
+        # 创建索引
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_orders_account_created ON orders(account_id, created_at)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_orders_strategy ON orders(strategy)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_risk_events_ts ON risk_events(timestamp)')
+        
+        cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        cursor.execute('COMMIT')
     
     def save_order(self, order_data: Dict[str, Any]):
-        """保存订单数据"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO orders 
-            (order_id, account_id, ticker, side, quantity, price, status, strategy, created_at, filled_at, pnl)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        """保存订单数据（写入缓冲）"""
+        self._order_buf.append((
             order_data.get('order_id'),
             order_data.get('account_id'),
             order_data.get('ticker'),
@@ -103,19 +171,10 @@ class DatabaseManager:
             order_data.get('filled_at'),
             order_data.get('pnl', 0)
         ))
-        
-        conn.commit()
-        conn.close()
     
     def save_performance_metrics(self, metrics: PerformanceMetrics):
-        """保存性能指标"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO performance_metrics 
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        """保存性能指标（写入缓冲）"""
+        self._metric_buf.append((
             metrics.timestamp.isoformat(),
             metrics.total_trades,
             metrics.successful_trades,
@@ -125,31 +184,96 @@ class DatabaseManager:
             metrics.success_rate,
             metrics.pnl
         ))
-        
-        conn.commit()
-        conn.close()
     
     def log_risk_event(self, event_type: str, severity: str, description: str, 
                       account_id: str = None, ticker: str = None):
-        """记录风险事件"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO risk_events 
-            (timestamp, event_type, severity, description, account_id, ticker)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (
-            datetime.now().isoformat(),
+        """记录风险事件（写入缓冲）"""
+        # 时间戳在写入时再格式化
+        self._risk_buf.append((
+            time.time(),
             event_type,
             severity,
             description,
             account_id,
             ticker
         ))
+    
+    @staticmethod
+    def _drain(buf: deque) -> List[tuple]:
+        """取出缓冲中的全部记录"""
+        return [buf.popleft() for _ in range(len(buf))]
+    
+    def flush(self):
+        """将缓冲记录批量写入数据库"""
+        orders = self._drain(self._order_buf)
+        metrics = self._drain(self._metric_buf)
+        risk_events = self._drain(self._risk_buf)
+        
+        if not (orders or metrics or risk_events):
+            return
+        
+        batches = (
+            (ORDER_SQL, orders),
+            (PERFORMANCE_METRICS_SQL, metrics),
+            (RISK_EVENT_SQL, [
+                (datetime.fromtimestamp(ts).isoformat(), *event) for ts, *event in risk_events
+            ]),
+        )
+        
+        conn = self._conn()
+        try:
+            try:
+                self._write_batches(conn, batches)
+            except sqlite3.OperationalError:
+                raise
+            except Exception as e:
+                # 批次中有无法写入的记录，逐行重写并丢弃坏记录
+                self.logger.warning("批量写入失败，改为逐行写入: %s", e)
+                self._write_batches(conn, batches, row_by_row=True)
+        except sqlite3.OperationalError:
+            # 数据库锁定或 I/O 等临时错误：把记录放回缓冲头部，保持原有顺序，下次 flush 重试
+            self._order_buf.extendleft(reversed(orders))
+            self._metric_buf.extendleft(reversed(metrics))
+            self._risk_buf.extendleft(reversed(risk_events))
+            raise
+    
+    def _write_batches(self, conn: sqlite3.Connection, batches, row_by_row: bool = False):
+        """在同一个事务中写入三张表，每次 flush 只提交一次"""
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            for sql, rows in batches:
+                if not rows:
+                    continue
+                if not row_by_row:
+                    conn.executemany(sql, rows)
+                    continue
+                for row in rows:
+                    try:
+                        conn.execute(sql, row)
+                    except sqlite3.OperationalError:
+                        raise
+                    except Exception as e:
+                        self.logger.error("丢弃无法写入的记录: %s, %s", row, e)
+            conn.execute('COMMIT')
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+    
+    def get_performance_metrics(self, start: str, end: str) -> List[Dict[str, Any]]:
+        """查询时间区间内的性能指标"""
+        cursor = self._conn().cursor()
+        
+        cursor.execute('''
+            SELECT * FROM performance_metrics 
+            WHERE timestamp BETWEEN ? AND ?
+            ORDER BY timestamp
+        ''', (start, end))
         
-        conn.commit()
-        conn.close()
+        rows = cursor.fetchall()
+        columns = [description[0] for description in cursor.description]
+        
+        return [dict(zip(columns, row)) for row in rows]
 
 class MonitoringSystem:
     """监控系统"""
@@ -158,20 +282,24 @@ class MonitoringSystem:
         self.config = config
         self.logger = self._setup_logger()
         self.db_manager = DatabaseManager()
+        # 单写线程，避免 SQLite 写锁竞争且不阻塞事件循环
+        self._db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db_writer")
         
         # 监控指标
-        self.metrics = {
-            'total_trades': 0,
-            'successful_trades': 0,
-            'failed_trades': 0,
-            'total_volume': 0.0,
-            'execution_times': [],
-            'last_update': datetime.now()
-        }
+        self.successful_trades = 0
+        self.failed_trades = 0
+        self.total_volume = 0.0
+        self.last_update = datetime.now()
+        
+        # 最近100次执行时间及其累加和
+        self._exec_times = deque(maxlen=100)
+        self._exec_sum = 0.0
         
         # 警报配置
         self.alert_config = config.get('alerts', {})
         self.alert_channels = []
+        self._alert_cooldown = self.alert_config.get('alert_cooldown', 300)  # 同类警报冷却时间(秒)
+        self._last_alert: Dict[str, float] = {}
         
         self.is_running = False
     
@@ -196,8 +324,16 @@ class MonitoringSystem:
         console_handler.setFormatter(formatter)
         file_handler.setFormatter(formatter)
         
-        logger.addHandler(console_handler)
-        logger.addHandler(file_handler)
+        # 通过队列交给后台线程写出，避免阻塞事件循环
+        log_queue = queue.SimpleQueue()
+        self._log_listener = QueueListener(
+            log_queue, console_handler, file_handler, respect_handler_level=True
+        )
+        self._log_listener.start()
+        
+        logger.addHandler(QueueHandler(log_queue))
+        # 不再传递给根日志器，避免在事件循环线程中同步写出和重复输出
+        logger.propagate = False
         
         return logger
     
@@ -210,13 +346,31 @@ class MonitoringSystem:
         await asyncio.gather(
             self._performance_monitoring_loop(),
             self._health_check_loop(),
-            self._alert_processing_loop()
+            self._alert_processing_loop(),
+            self._db_flush_loop()
         )
     
     async def stop(self):
         """停止监控系统"""
         self.is_running = False
+        await self._flush_db()
         self.logger.info("监控系统停止")
+        self._log_listener.stop()
+    
+    async def _flush_db(self):
+        """在写线程中执行批量写入"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._db_executor, self.db_manager.flush)
+    
+    async def _db_flush_loop(self):
+        """数据库批量写入循环"""
+        while self.is_running:
+            try:
+                await self._flush_db()
+                await asyncio.sleep(1)  # 每秒批量写入一次
+            except Exception as e:
+                self.logger.error(f"数据库写入错误: {e}")
+                await asyncio.sleep(1)
     
     async def _performance_monitoring_loop(self):
         """性能监控循环"""
@@ -230,39 +384,20 @@ class MonitoringSystem:
     
     async def _update_performance_metrics(self):
         """更新性能指标"""
-        now = datetime.now()
-        
-        # 计算成功率
-        total_trades = self.metrics['successful_trades'] + self.metrics['failed_trades']
-        success_rate = (self.metrics['successful_trades'] / total_trades) if total_trades > 0 else 0
-        
-        # 计算平均执行时间
-        avg_execution_time = (
-            sum(self.metrics['execution_times']) / len(self.metrics['execution_times'])
-            if self.metrics['execution_times'] else 0
-        )
+        snapshot = self._snapshot()
         
         # 创建性能指标对象
         metrics = PerformanceMetrics(
-            timestamp=now,
-            total_trades=total_trades,
-            successful_trades=self.metrics['successful_trades'],
-            failed_trades=self.metrics['failed_trades'],
-            total_volume=self.metrics['total_volume'],
-            average_execution_time=avg_execution_time,
-            success_rate=success_rate,
-            pnl=0.0  # 需要从其他模块获取
+            timestamp=datetime.now(),
+            pnl=0.0,  # 需要从其他模块获取
+            **snapshot
         )
         
         # 保存到数据库
         self.db_manager.save_performance_metrics(metrics)
         
         # 记录日志
-        self.logger.info(f"性能指标更新: 成功率 {success_rate:.2%}, 总交易量 {self.metrics['total_volume']:.2f}")
-        
-        # 重置执行时间列表（保持最近100个）
-        if len(self.metrics['execution_times']) > 100:
-            self.metrics['execution_times'] = self.metrics['execution_times'][-100:]
+        self.logger.info(f"性能指标更新: 成功率 {snapshot['success_rate']:.2%}, 总交易量 {self.total_volume:.2f}")
     
     async def _health_check_loop(self):
         """健康检查循环"""
@@ -277,22 +412,21 @@ class MonitoringSystem:
     async def _perform_health_checks(self):
         """执行健康检查"""
         # 检查内存使用
-        import psutil
         memory_usage = psutil.virtual_memory().percent
         
         if memory_usage > 90:
             await self._send_alert("high_memory_usage", f"内存使用率过高: {memory_usage:.1f}%")
         
         # 检查成功率
-        total_trades = self.metrics['successful_trades'] + self.metrics['failed_trades']
+        total_trades = self.total_trades
         if total_trades > 10:
-            success_rate = self.metrics['successful_trades'] / total_trades
+            success_rate = self.successful_trades / total_trades
             if success_rate < 0.8:
                 await self._send_alert("low_success_rate", f"成功率过低: {success_rate:.2%}")
         
         # 检查平均执行时间
-        if self.metrics['execution_times']:
-            avg_time = sum(self.metrics['execution_times']) / len(self.metrics['execution_times'])
+        if self._exec_times:
+            avg_time = self._average_execution_time()
             if avg_time > 5.0:  # 超过5秒
                 await self._send_alert("slow_execution", f"执行时间过长: {avg_time:.2f}秒")
     
@@ -308,12 +442,12 @@ class MonitoringSystem:
     
     async def _send_alert(self, alert_type: str, message: str):
         """发送警报"""
-        alert = {
-            'type': alert_type,
-            'message': message,
-            'timestamp': datetime.now().isoformat(),
-            'severity': 'warning'
-        }
+        # 同类警报在冷却时间内只发送一次
+        now = time.monotonic()
+        last_sent = self._last_alert.get(alert_type)
+        if last_sent is not None and now - last_sent < self._alert_cooldown:
+            return
+        self._last_alert[alert_type] = now
         
         self.logger.warning(f"警报: {alert_type} - {message}")
         
@@ -323,51 +457,50 @@ class MonitoringSystem:
     async def on_order_update(self, order_update: Dict[str, Any]):
         """订单更新回调"""
         # 更新统计
-        if order_update['status'] == 'filled':
-            self.metrics['successful_trades'] += 1
-            self.metrics['total_volume'] += order_update.get('quantity', 0)
-        elif order_update['status'] == 'failed':
-            self.metrics['failed_trades'] += 1
+        status = order_update['status']
+        if status == 'filled':
+            self.successful_trades += 1
+            self.total_volume += order_update.get('quantity', 0)
+        elif status == 'failed':
+            self.failed_trades += 1
         
         # 保存订单数据
         self.db_manager.save_order(order_update)
     
     async def on_execution_time(self, execution_time: float):
         """记录执行时间"""
-        self.metrics['execution_times'].append(execution_time)
+        if len(self._exec_times) == self._exec_times.maxlen:
+            self._exec_sum -= self._exec_times[0]
+        self._exec_times.append(execution_time)
+        self._exec_sum += execution_time
     
-    def get_current_metrics(self) -> Dict[str, Any]:
-        """获取当前指标"""
-        total_trades = self.metrics['successful_trades'] + self.metrics['failed_trades']
-        success_rate = (self.metrics['successful_trades'] / total_trades) if total_trades > 0 else 0
-        
+    def _average_execution_time(self) -> float:
+        """最近执行时间的平均值"""
+        return self._exec_sum / len(self._exec_times) if self._exec_times else 0
+    
+    @property
+    def total_trades(self) -> int:
+        """已完成交易总数"""
+        return self.successful_trades + self.failed_trades
+    
+    def _snapshot(self) -> Dict[str, Any]:
+        """一次性计算全部派生指标"""
+        total_trades = self.total_trades
         return {
             'total_trades': total_trades,
-            'successful_trades': self.metrics['successful_trades'],
-            'failed_trades': self.metrics['failed_trades'],
-            'success_rate': success_rate,
-            'total_volume': self.metrics['total_volume'],
-            'average_execution_time': (
-                sum(self.metrics['execution_times']) / len(self.metrics['execution_times'])
-                if self.metrics['execution_times'] else 0
-            ),
-            'last_update': self.metrics['last_update'].isoformat()
+            'successful_trades': self.successful_trades,
+            'failed_trades': self.failed_trades,
+            'success_rate': (self.successful_trades / total_trades) if total_trades > 0 else 0,
+            'total_volume': self.total_volume,
+            'average_execution_time': self._average_execution_time()
         }
     
+    def get_current_metrics(self) -> Dict[str, Any]:
+        """获取当前指标"""
+        metrics = self._snapshot()
+        metrics['last_update'] = self.last_update.isoformat()
+        return metrics
+    
     def get_historical_data(self, start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
         """获取历史数据"""
-        conn = sqlite3.connect(self.db_manager.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT * FROM performance_metrics 
-            WHERE timestamp BETWEEN ? AND ?
-            ORDER BY timestamp
-        ''', (start_date.isoformat(), end_date.isoformat()))
-        
-        rows = cursor.fetchall()
-        columns = [description[0] for description in cursor.description]
-        
-        conn.close()
-        
-        return [dict(zip(columns, row)) for row in rows]
\ No newline at end of file
+        return self.db_manager.get_performance_metrics(start_date.isoformat(), end_date.isoformat())
\ No newline at end of file
@@ -2,8 +2,11 @@
 风险管理模块 - 交易风险控制和资金管理
 """
 import asyncio
-from typing import Dict, List, Any, Optional
-from datetime import datetime, timedelta
+import sys
+import time
+from collections import deque
+from typing import Dict, Any, Optional
+from datetime import timedelta
 import logging
 from dataclasses import dataclass
 
@@ -19,6 +22,22 @@ class RiskMetrics:
     total_pnl: float = 0.0
     daily_pnl: float = 0.0
 
+@dataclass(slots=True)
+class TradeRecord:
+    """交易记录"""
+    timestamp: int  # 纳秒时间戳，需要时再转换为 datetime
+    account_id: str
+    ticker: str
+    side: str
+    quantity: float
+    price: float
+    pnl: float = 0.0
+    
+    @property
+    def value(self) -> float:
+        """成交金额"""
+        return self.quantity * self.price
+
 class RiskManager:
     """风险管理器"""
     
@@ -35,13 +54,21 @@ class RiskManager:
         # 仓位管理参数
         self.position_size_method = config.get('position_size_method', 'fixed')
         self.risk_per_trade = config.get('risk_per_trade', 0.02)  # 每笔交易风险2%
+        self.fixed_position_size = config.get('fixed_position_size', 100)  # 固定仓位大小
+        self.default_position_size = config.get('default_position_size', 100)  # 默认仓位大小
         
         # 风险监控数据
         self.positions: Dict[str, Dict[str, float]] = {}  # 账户持仓
         self.daily_pnl: Dict[str, float] = {}  # 日盈亏
-        self.trade_history: List[Dict[str, Any]] = []  # 交易历史
+        self.trade_history: deque[TradeRecord] = deque(maxlen=config.get('history_size', 100000))  # 最近交易历史
         self.risk_metrics = RiskMetrics()
         
+        # 增量维护的权益与胜率统计
+        self._current_equity = 10000.0  # 假设初始资金10000
+        self._peak_equity = self._current_equity
+        self._profit_count = 0
+        self._trade_count = 0
+        
         # 风险状态
         self.is_risk_mode = False
         self.emergency_stop = False
@@ -60,11 +87,11 @@ class RiskManager:
             return False
         
         # 检查仓位限制
-        if not await self._check_position_limits(account_id, ticker, quantity, side):
+        if not self._check_position_limits(account_id, ticker, quantity, side):
             return False
         
         # 检查日损失限制
-        if not await self._check_daily_loss_limit(account_id):
+        if not self._check_daily_loss_limit(account_id):
             return False
         
         # 检查资金充足性
@@ -72,17 +99,15 @@ class RiskManager:
             return False
         
         # 检查回撤限制
-        if not await self._check_drawdown_limit(account_id):
+        if not self._check_drawdown_limit(account_id):
             return False
         
         return True
     
-    async def _check_position_limits(self, account_id: str, ticker: str, quantity: float, side: str) -> bool:
+    def _check_position_limits(self, account_id: str, ticker: str, quantity: float, side: str) -> bool:
         """检查仓位限制"""
-        if account_id not in self.positions:
-            self.positions[account_id] = {}
-        
-        current_position = self.positions[account_id].get(ticker, 0)
+        account_positions = self.positions.get(account_id)
+        current_position = account_positions.get(ticker, 0) if account_positions else 0
         
         if side == 'buy':
             new_position = current_position + quantity
@@ -91,17 +116,17 @@ class RiskManager:
         
         # 检查单一仓位限制
         if abs(new_position) > self.max_position_size:
-            self.logger.warning(f"仓位超限: {ticker} {new_position} > {self.max_position_size}")
+            self.logger.warning("仓位超限: %s %s > %s", ticker, new_position, self.max_position_size)
             return False
         
         return True
     
-    async def _check_daily_loss_limit(self, account_id: str) -> bool:
+    def _check_daily_loss_limit(self, account_id: str) -> bool:
         """检查日损失限制"""
         current_daily_pnl = self.daily_pnl.get(account_id, 0)
         
         if current_daily_pnl < -self.max_daily_loss:
-            self.logger.warning(f"日损失超限: {current_daily_pnl} < -{self.max_daily_loss}")
+            self.logger.warning("日损失超限: %s < -%s", current_daily_pnl, self.max_daily_loss)
             self.is_risk_mode = True
             return False
         
@@ -114,10 +139,10 @@ class RiskManager:
         # 简化实现，假设资金充足
         return True
     
-    async def _check_drawdown_limit(self, account_id: str) -> bool:
+    def _check_drawdown_limit(self, account_id: str) -> bool:
         """检查回撤限制"""
         if self.risk_metrics.current_drawdown > self.max_drawdown_limit:
-            self.logger.warning(f"回撤超限: {self.risk_metrics.current_drawdown:.4f} > {self.max_drawdown_limit}")
+            self.logger.warning("回撤超限: %.4f > %s", self.risk_metrics.current_drawdown, self.max_drawdown_limit)
             self.is_risk_mode = True
             return False
         
@@ -125,38 +150,38 @@ class RiskManager:
     
     async def update_position(self, account_id: str, ticker: str, side: str, quantity: float, price: float):
         """更新仓位"""
-        if account_id not in self.positions:
-            self.positions[account_id] = {}
+        # 提交、失败等未成交的订单更新不影响仓位和交易统计
+        if not quantity:
+            return
         
-        if ticker not in self.positions[account_id]:
-            self.positions[account_id][ticker] = 0
+        # 驻留长期保存的字符串，交易记录和持仓键共享同一对象
+        if account_id is not None:  # 未指定账户的订单 account_id 为 None
+            account_id = sys.intern(account_id)
+        ticker = sys.intern(ticker)
+        side = sys.intern(side)
         
-        if side == 'buy':
-            self.positions[account_id][ticker] += quantity
-        else:
-            self.positions[account_id][ticker] -= quantity
-        
-        # 记录交易
-        trade = {
-            'timestamp': datetime.now(),
-            'account_id': account_id,
-            'ticker': ticker,
-            'side': side,
-            'quantity': quantity,
-            'price': price,
-            'value': quantity * price
-        }
-        self.trade_history.append(trade)
-        
-        # 更新盈亏
-        await self._update_pnl(account_id, ticker, side, quantity, price)
-        
-        self.logger.info(f"更新仓位: {account_id} {ticker} {self.positions[account_id][ticker]}")
+        account_positions = self.positions.get(account_id)
+        if account_positions is None:
+            account_positions = self.positions[account_id] = {}
+        
+        delta = quantity if side == 'buy' else -quantity
+        new_position = account_positions.get(ticker, 0) + delta
+        account_positions[ticker] = new_position
+        
+        # 更新盈亏并记录交易
+        pnl = self._update_pnl(account_id, ticker, side, quantity, price)
+        self.trade_history.append(
+            TradeRecord(time.time_ns(), account_id, ticker, side, quantity, price, pnl)
+        )
+        self._trade_count += 1
+        
+        self.logger.info("更新仓位: %s %s %s", account_id, ticker, new_position)
     
-    async def _update_pnl(self, account_id: str, ticker: str, side: str, quantity: float, price: float):
-        """更新盈亏"""
+    def _update_pnl(self, account_id: str, ticker: str, side: str, quantity: float, price: float) -> float:
+        """更新盈亏，返回本笔交易盈亏"""
         # 简化的盈亏计算
         trade_value = quantity * price
+        pnl = 0.0
         
         if side == 'sell':
             # 卖出时计算盈亏
@@ -168,11 +193,24 @@ class RiskManager:
             self.daily_pnl[account_id] += pnl
             self.risk_metrics.daily_pnl += pnl
             self.risk_metrics.total_pnl += pnl
+        
+        # 增量更新权益峰值与回撤
+        if pnl > 0:
+            self._profit_count += 1
+        self._current_equity += pnl
+        if self._current_equity > self._peak_equity:
+            self._peak_equity = self._current_equity
+        current_drawdown = (self._peak_equity - self._current_equity) / self._peak_equity
+        self.risk_metrics.current_drawdown = current_drawdown
+        if current_drawdown > self.risk_metrics.max_drawdown:
+            self.risk_metrics.max_drawdown = current_drawdown
+        
+        return pnl
     
     def calculate_position_size(self, account_balance: float, entry_price: float, stop_loss_price: float) -> float:
         """计算仓位大小"""
         if self.position_size_method == 'fixed':
-            return self.config.get('fixed_position_size', 100)
+            return self.fixed_position_size
         
         elif self.position_size_method == 'risk_based':
             # 基于风险的仓位计算
@@ -194,35 +232,15 @@ class RiskManager:
                 
                 return account_balance * kelly_fraction / entry_price
         
-        return self.config.get('default_position_size', 100)
+        return self.default_position_size
     
     async def update_risk_metrics(self):
         """更新风险指标"""
-        if not self.trade_history:
+        if not self._trade_count:
             return
         
-        # 计算胜率
-        profitable_trades = [t for t in self.trade_history if t.get('pnl', 0) > 0]
-        self.risk_metrics.win_rate = len(profitable_trades) / len(self.trade_history)
-        
-        # 计算回撤
-        equity_curve = self._calculate_equity_curve()
-        if equity_curve:
-            max_equity = max(equity_curve)
-            current_equity = equity_curve[-1]
-            self.risk_metrics.current_drawdown = (max_equity - current_equity) / max_equity
-            self.risk_metrics.max_drawdown = max(self.risk_metrics.max_drawdown, 
-                                                self.risk_metrics.current_drawdown)
-    
-    def _calculate_equity_curve(self) -> List[float]:
-        """计算权益曲线"""
-        equity_curve = [10000]  # 假设初始资金10000
-        
-        for trade in self.trade_history:
-            pnl = trade.get('pnl', 0)
-            equity_curve.append(equity_curve[-1] + pnl)
-        
-        return equity_curve
+        # 计算胜率（回撤已在每笔交易时增量更新）
+        self.risk_metrics.win_rate = self._profit_count / self._trade_count
     
     async def emergency_stop_all(self):
         """紧急停止所有交易"""
@@ -258,5 +276,5 @@ class RiskManager:
                 'is_risk_mode': self.is_risk_mode,
                 'emergency_stop': self.emergency_stop
             },
-            'trade_count': len(self.trade_history)
+            'trade_count': self._trade_count
         }
\ No newline at end of file
@@ -2,26 +2,42 @@
 """
 Ethereal 测试网交易量刷取系统 - 快速启动脚本
 """
+import argparse
+import importlib.util
 import subprocess
 import sys
 import json
 from pathlib import Path
 
-def check_dependencies():
-    """检查依赖包"""
-    try:
-        import ethereal
-        print("✓ ethereal-sdk 已安装")
-    except ImportError:
-        print("✗ ethereal-sdk 未安装，正在安装...")
-        subprocess.run([sys.executable, "-m", "pip", "install", "ethereal-sdk>=0.1.0b15"])
+# 模块名 -> pip 安装规格
+REQUIRED_PACKAGES = {
+    "ethereal": "ethereal-sdk>=0.1.0b15",
+    "psutil": "psutil>=5.9.0",
+    "httpx": "httpx>=0.27.0",
+}
+
+def check_dependencies(install: bool = False) -> bool:
+    """检查依赖包，仅在显式要求时安装"""
+    missing = []
+    for module, requirement in REQUIRED_PACKAGES.items():
+        if importlib.util.find_spec(module) is None:
+            print(f"✗ {requirement} 未安装")
+            missing.append(requirement)
+        else:
+            print(f"✓ {requirement} 已安装")
+    
+    if not missing:
+        return True
+    
+    if install:
+        print("正在安装缺失的依赖...")
+        result = subprocess.run([sys.executable, "-m", "pip", "install", *missing])
+        return result.returncode == 0
     
-    try:
-        import psutil
-        print("✓ psutil 已安装")
-    except ImportError:
-        print("✗ psutil 未安装，正在安装...")
-        subprocess.run([sys.executable, "-m", "pip", "install", "psutil>=5.9.0"])
+    print("\n请先安装缺失的依赖:")
+    print(f"  pip install {' '.join(repr(req) for req in missing)}")
+    print("或使用 python start.py --install-deps 自动安装")
+    return False
 
 def create_sample_config():
     """创建示例配置文件"""
@@ -79,6 +95,10 @@ def create_sample_config():
 
 def main():
     """主函数"""
+    parser = argparse.ArgumentParser(description="Ethereal 测试网交易量刷取系统启动脚本")
+    parser.add_argument("--install-deps", action="store_true", help="自动安装缺失的依赖包")
+    args = parser.parse_args()
+    
     print("=== Ethereal 测试网交易量刷取系统 ===")
     print("正在检查系统环境...")
     
@@ -91,7 +111,8 @@ def main():
     print(f"✓ Python 版本: {sys.version}")
     
     # 检查依赖
-    check_dependencies()
+    if not check_dependencies(args.install_deps):
+        return
     
     # 创建配置文件
     create_sample_config()
@@ -3,7 +3,7 @@
 """
 import asyncio
 from typing import Dict, List, Any, Tuple
-from .base_strategy import BaseStrategy
+from .base_strategy import BaseStrategy, OrderRequest
 
 class ArbitrageStrategy(BaseStrategy):
     """套利策略"""
@@ -16,7 +16,14 @@ class ArbitrageStrategy(BaseStrategy):
         self.min_profit_threshold = config.get('min_profit_threshold', 0.002)  # 最小利润阈值
         self.max_volume = config.get('max_volume', 1.0)  # 最大交易量
         
-    async def execute(self, market_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        # 套利对配置在运行期间不变，预先展开为 (交易对A, 交易对B, 汇率, 套利对名称)
+        self._arb_plan = [
+            (pair['ticker_a'], pair['ticker_b'], pair.get('exchange_rate', 1.0),  # 汇率或转换比例
+             f"{pair['ticker_a']}-{pair['ticker_b']}")
+            for pair in self.arbitrage_pairs
+        ]
+        
+    async def execute(self, market_data: Dict[str, Any]) -> List[OrderRequest]:
         """执行套利策略"""
         if not self.is_running:
             return []
@@ -24,24 +31,23 @@ class ArbitrageStrategy(BaseStrategy):
         orders = []
         
         # 检查所有套利机会
-        for arb_pair in self.arbitrage_pairs:
-            arb_orders = await self._check_arbitrage_opportunity(arb_pair, market_data)
-            orders.extend(arb_orders)
+        for ticker_a, ticker_b, exchange_rate, arbitrage_pair in self._arb_plan:
+            data_a = market_data.get(ticker_a)
+            data_b = market_data.get(ticker_b)
+            if data_a is None or data_b is None:
+                continue
+            
+            arb_orders = self._check_arbitrage_opportunity(
+                ticker_a, ticker_b, exchange_rate, arbitrage_pair, data_a['price'], data_b['price']
+            )
+            if arb_orders:
+                orders.extend(arb_orders)
         
         return orders
     
-    async def _check_arbitrage_opportunity(self, arb_pair: Dict[str, Any], market_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _check_arbitrage_opportunity(self, ticker_a: str, ticker_b: str, exchange_rate: float,
+                                     arbitrage_pair: str, price_a: float, price_b: float) -> List[OrderRequest]:
         """检查套利机会"""
-        ticker_a = arb_pair['ticker_a']
-        ticker_b = arb_pair['ticker_b']
-        exchange_rate = arb_pair.get('exchange_rate', 1.0)  # 汇率或转换比例
-        
-        if ticker_a not in market_data or ticker_b not in market_data:
-            return []
-        
-        price_a = market_data[ticker_a]['price']
-        price_b = market_data[ticker_b]['price']
-        
         # 计算价差和利润率
         price_diff = price_a - (price_b * exchange_rate)
         profit_rate = abs(price_diff) / price_a
@@ -54,50 +60,30 @@ class ArbitrageStrategy(BaseStrategy):
         
         # 如果 A 比 B 贵，卖 A 买 B
         if price_diff > 0:
-            orders.append({
-                'ticker': ticker_a,
-                'side': 'sell',
-                'quantity': volume,
-                'price': price_a * 0.999,  # 稍低于市价
-                'type': 'limit',
-                'strategy': self.name,
-                'arbitrage_pair': f"{ticker_a}-{ticker_b}"
-            })
+            orders.append(OrderRequest(
+                ticker_a, 'sell', volume, price_a * 0.999, self.name,  # 稍低于市价
+                arbitrage_pair=arbitrage_pair
+            ))
             
-            orders.append({
-                'ticker': ticker_b,
-                'side': 'buy',
-                'quantity': volume * exchange_rate,
-                'price': price_b * 1.001,  # 稍高于市价
-                'type': 'limit',
-                'strategy': self.name,
-                'arbitrage_pair': f"{ticker_a}-{ticker_b}"
-            })
+            orders.append(OrderRequest(
+                ticker_b, 'buy', volume * exchange_rate, price_b * 1.001, self.name,  # 稍高于市价
+                arbitrage_pair=arbitrage_pair
+            ))
         
         # 如果 B 比 A 贵，买 A 卖 B
         else:
-            orders.append({
-                'ticker': ticker_a,
-                'side': 'buy',
-                'quantity': volume,
-                'price': price_a * 1.001,
-                'type': 'limit',
-                'strategy': self.name,
-                'arbitrage_pair': f"{ticker_a}-{ticker_b}"
-            })
+            orders.append(OrderRequest(
+                ticker_a, 'buy', volume, price_a * 1.001, self.name,
+                arbitrage_pair=arbitrage_pair
+            ))
             
-            orders.append({
-                'ticker': ticker_b,
-                'side': 'sell',
-                'quantity': volume * exchange_rate,
-                'price': price_b * 0.999,
-                'type': 'limit',
-                'strategy': self.name,
-                'arbitrage_pair': f"{ticker_a}-{ticker_b}"
-            })
+            orders.append(OrderRequest(
+                ticker_b, 'sell', volume * exchange_rate, price_b * 0.999, self.name,
+                arbitrage_pair=arbitrage_pair
+            ))
         
         if orders:
-            self.logger.info(f"发现套利机会: {ticker_a} vs {ticker_b}, 利润率: {profit_rate:.4f}")
+            self.logger.info("发现套利机会: %s vs %s, 利润率: %.4f", ticker_a, ticker_b, profit_rate)
         
         return orders
     
@@ -110,4 +96,4 @@ class ArbitrageStrategy(BaseStrategy):
         """处理订单更新"""
         if order_update['status'] == 'filled':
             arbitrage_pair = order_update.get('arbitrage_pair', '')
-            self.logger.info(f"套利订单成交: {arbitrage_pair}")
\ No newline at end of file
+            self.logger.info("套利订单成交: %s", arbitrage_pair)
\ No newline at end of file
@@ -2,11 +2,23 @@
 基础策略抽象类
 """
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, NamedTuple
 import asyncio
 import logging
 from datetime import datetime
 
+class OrderRequest(NamedTuple):
+    """策略生成的下单请求"""
+    ticker: str
+    side: str  # 'buy' or 'sell'
+    quantity: float
+    price: float
+    strategy: str
+    type: str = 'limit'
+    account_id: Optional[str] = None
+    grid_level: int = 0  # 网格层级（网格策略）
+    arbitrage_pair: str = ''  # 套利对（套利策略）
+
 class BaseStrategy(ABC):
     """交易策略基类"""
     
@@ -22,8 +34,8 @@ class BaseStrategy(ABC):
         self.min_spread = config.get('min_spread', 0.0001)  # 最小价差
         
     @abstractmethod
-    async def execute(self, market_data: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """执行策略，返回订单列表"""
+    async def execute(self, market_data: Dict[str, Any]) -> List[OrderRequest]:
+        """执行策略，返回下单请求列表"""
         pass
     
     @abstractmethod
@@ -3,7 +3,7 @@
 """
 import math
 from typing import Dict, List, Any
-from .base_strategy import BaseStrategy
+from .base_strategy import BaseStrategy, OrderRequest
 
 class GridTradingStrategy(BaseStrategy):
     """网格交易策略"""
@@ -16,10 +16,18 @@ class GridTradingStrategy(BaseStrategy):
         self.grid_spacing = config.get('grid_spacing', 0.005)  # 网格间距 (0.5%)
         self.base_volume = config.get('base_volume', 0.1)  # 基础交易量
         self.center_price = config.get('center_price', None)  # 中心价格
+        self.tickers = config.get('tickers', [])  # 交易对列表
         
         self.grid_orders = {}  # 记录网格订单
         
-    async def execute(self, market_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        # 预计算各网格层级的价格乘数 (层级, 1 + 层级 * 间距)，跳过中心价格
+        self._grid_levels = [
+            (i, 1 + i * self.grid_spacing)
+            for i in range(-self.grid_count // 2, self.grid_count // 2 + 1)
+            if i != 0
+        ]
+        
+    async def execute(self, market_data: Dict[str, Any]) -> List[OrderRequest]:
         """执行网格策略"""
         if not self.is_running:
             return []
@@ -27,7 +35,7 @@ class GridTradingStrategy(BaseStrategy):
         orders = []
         
         # 获取当前市场价格
-        for ticker in self.config.get('tickers', []):
+        for ticker in self.tickers:
             if ticker not in market_data:
                 continue
                 
@@ -43,42 +51,24 @@ class GridTradingStrategy(BaseStrategy):
         
         return orders
     
-    async def _generate_grid_orders(self, ticker: str, current_price: float) -> List[Dict[str, Any]]:
+    async def _generate_grid_orders(self, ticker: str, current_price: float) -> List[OrderRequest]:
         """生成网格订单"""
         orders = []
+        center_price = self.center_price
         
-        # 计算网格价格点
-        for i in range(-self.grid_count//2, self.grid_count//2 + 1):
-            if i == 0:
-                continue  # 跳过中心价格
-                
-            grid_price = self.center_price * (1 + i * self.grid_spacing)
-            
-            # 如果价格低于当前价格，下买单
+        # 计算网格价格点：低于当前价格下买单，高于当前价格下卖单
+        for i, multiplier in self._grid_levels:
+            grid_price = center_price * multiplier
             if grid_price < current_price:
-                order = {
-                    'ticker': ticker,
-                    'side': 'buy',
-                    'quantity': self.base_volume,
-                    'price': grid_price,
-                    'type': 'limit',
-                    'strategy': self.name,
-                    'grid_level': i
-                }
-                orders.append(order)
-            
-            # 如果价格高于当前价格，下卖单
+                side = 'buy'
             elif grid_price > current_price:
-                order = {
-                    'ticker': ticker,
-                    'side': 'sell',
-                    'quantity': self.base_volume,
-                    'price': grid_price,
-                    'type': 'limit',
-                    'strategy': self.name,
-                    'grid_level': i
-                }
-                orders.append(order)
+                side = 'sell'
+            else:
+                continue
+            
+            orders.append(OrderRequest(
+                ticker, side, self.base_volume, grid_price, self.name, grid_level=i
+            ))
         
         return orders
     
@@ -103,4 +93,4 @@ class GridTradingStrategy(BaseStrategy):
             new_price = filled_order['price'] * (1 - self.grid_spacing)
             new_side = 'buy'
         
-        self.logger.info(f"网格订单成交，下反向订单: {ticker} {new_side} @ {new_price:.6f}")
\ No newline at end of file
+        self.logger.info("网格订单成交，下反向订单: %s %s @ %.6f", ticker, new_side, new_price)
\ No newline at end of file
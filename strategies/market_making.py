@@ -3,7 +3,7 @@
 """
 import asyncio
 from typing import Dict, List, Any
-from .base_strategy import BaseStrategy
+from .base_strategy import BaseStrategy, OrderRequest
 
 class MarketMakingStrategy(BaseStrategy):
     """做市策略"""
@@ -16,21 +16,23 @@ class MarketMakingStrategy(BaseStrategy):
         self.order_size = config.get('order_size', 0.1)  # 订单大小
         self.max_inventory = config.get('max_inventory', 1.0)  # 最大库存
         self.inventory_skew = config.get('inventory_skew', 0.5)  # 库存偏斜
+        self.tickers = config.get('tickers', [])  # 交易对列表
         
         self.current_inventory = {}  # 当前库存
         
-    async def execute(self, market_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    async def execute(self, market_data: Dict[str, Any]) -> List[OrderRequest]:
         """执行做市策略"""
         if not self.is_running:
             return []
         
         orders = []
         
-        for ticker in self.config.get('tickers', []):
-            if ticker not in market_data:
+        for ticker in self.tickers:
+            ticker_data = market_data.get(ticker)
+            if ticker_data is None:
                 continue
             
-            market_price = market_data[ticker]['price']
+            market_price = ticker_data['price']
             current_inv = self.current_inventory.get(ticker, 0)
             
             # 计算买卖价格
@@ -40,24 +42,10 @@ class MarketMakingStrategy(BaseStrategy):
             bid_size, ask_size = self._calculate_order_sizes(current_inv)
             
             if bid_size > 0:
-                orders.append({
-                    'ticker': ticker,
-                    'side': 'buy',
-                    'quantity': bid_size,
-                    'price': bid_price,
-                    'type': 'limit',
-                    'strategy': self.name
-                })
+                orders.append(OrderRequest(ticker, 'buy', bid_size, bid_price, self.name))
             
             if ask_size > 0:
-                orders.append({
-                    'ticker': ticker,
-                    'side': 'sell',
-                    'quantity': ask_size,
-                    'price': ask_price,
-                    'type': 'limit',
-                    'strategy': self.name
-                })
+                orders.append(OrderRequest(ticker, 'sell', ask_size, ask_price, self.name))
         
         return orders
     
@@ -111,4 +99,4 @@ class MarketMakingStrategy(BaseStrategy):
             else:
                 self.current_inventory[ticker] -= quantity
             
-            self.logger.info(f"做市订单成交: {ticker} {side} {quantity}, 当前库存: {self.current_inventory[ticker]:.4f}")
\ No newline at end of file
+            self.logger.info("做市订单成交: %s %s %s, 当前库存: %.4f", ticker, side, quantity, self.current_inventory[ticker])
\ No newline at end of file
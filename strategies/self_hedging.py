@@ -4,7 +4,7 @@
 import asyncio
 import random
 from typing import Dict, List, Any
-from .base_strategy import BaseStrategy
+from .base_strategy import BaseStrategy, OrderRequest
 
 class SelfHedgingStrategy(BaseStrategy):
     """自对冲策略"""
@@ -20,47 +20,50 @@ class SelfHedgingStrategy(BaseStrategy):
         
         self.pending_orders = {}
         
-    async def execute(self, market_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        # 交易量上下限只解包一次
+        self._volume_low, self._volume_high = self.volume_range
+        
+        # 对冲配置在运行期间不变，预先展开为 (交易对, 买方账户, 卖方账户)
+        self._hedge_plan = [
+            (pair['ticker'], pair['buy_account'], pair['sell_account'])
+            for pair in self.hedge_pairs
+        ]
+        self._buy_price_factor = 1 - self.price_offset
+        self._sell_price_factor = 1 + self.price_offset
+        
+    async def execute(self, market_data: Dict[str, Any]) -> List[OrderRequest]:
         """执行自对冲策略"""
         if not self.is_running:
             return []
         
         orders = []
+        uniform = random.uniform
+        volume_low, volume_high = self._volume_low, self._volume_high
         
-        for pair in self.hedge_pairs:
-            ticker = pair['ticker']
-            if ticker not in market_data:
+        for ticker, buy_account, sell_account in self._hedge_plan:
+            ticker_data = market_data.get(ticker)
+            if ticker_data is None:
                 continue
                 
-            market_price = market_data[ticker]['price']
+            market_price = ticker_data['price']
             
             # 生成随机交易量
-            volume = random.uniform(*self.volume_range)
+            volume = uniform(volume_low, volume_high)
             
             # 创建对冲订单对
-            buy_order = {
-                'account_id': pair['buy_account'],
-                'ticker': ticker,
-                'side': 'buy',
-                'quantity': volume,
-                'price': market_price * (1 - self.price_offset),
-                'type': 'limit',
-                'strategy': self.name
-            }
+            buy_order = OrderRequest(
+                ticker, 'buy', volume, market_price * self._buy_price_factor, self.name,
+                account_id=buy_account
+            )
             
-            sell_order = {
-                'account_id': pair['sell_account'], 
-                'ticker': ticker,
-                'side': 'sell',
-                'quantity': volume,
-                'price': market_price * (1 + self.price_offset),
-                'type': 'limit',
-                'strategy': self.name
-            }
+            sell_order = OrderRequest(
+                ticker, 'sell', volume, market_price * self._sell_price_factor, self.name,
+                account_id=sell_account
+            )
             
             orders.extend([buy_order, sell_order])
             
-            self.logger.info(f"生成对冲订单对: {ticker}, 数量: {volume:.4f}")
+            self.logger.info("生成对冲订单对: %s, 数量: %.4f", ticker, volume)
         
         return orders
     
@@ -70,7 +73,7 @@ class SelfHedgingStrategy(BaseStrategy):
         status = order_update['status']
         
         if status == 'filled':
-            self.logger.info(f"订单 {order_id} 已成交")
+            self.logger.info("订单 %s 已成交", order_id)
             # 如果是对冲订单的一部分，检查是否需要调整
             await self._check_hedge_balance(order_update)
     
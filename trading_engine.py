@@ -2,31 +2,54 @@
 交易引擎 - 核心交易执行引擎
 """
 import asyncio
-import uuid
-from typing import Dict, List, Any, Optional, Callable
-from datetime import datetime
+import heapq
+import time
+from collections import Counter, deque
+from functools import partial
+from typing import Dict, List, Any, Optional, Callable, Set
 import logging
+import httpx
 from ethereal import AsyncRESTClient
 from account_manager import AccountManager
-from strategies.base_strategy import BaseStrategy
+from strategies.base_strategy import BaseStrategy, OrderRequest
+
+# 订单状态码，内部使用整数比较，对外通知时转换为名称
+STATUS_PENDING, STATUS_SUBMITTED, STATUS_PARTIAL, STATUS_FILLED, STATUS_CANCELLED, STATUS_FAILED = range(6)
+STATUS_NAMES = ('pending', 'submitted', 'partial', 'filled', 'cancelled', 'failed')
+
+# 终结状态的订单不再跟踪，对象回收到对象池
+TERMINAL_STATUSES = frozenset({STATUS_FILLED, STATUS_CANCELLED, STATUS_FAILED})
+ORDER_POOL_SIZE = 65536
 
 class Order:
     """订单类"""
     
-    def __init__(self, order_data: Dict[str, Any]):
-        self.order_id = str(uuid.uuid4())
-        self.account_id = order_data.get('account_id')
-        self.ticker = order_data['ticker']
-        self.side = order_data['side']  # 'buy' or 'sell'
-        self.quantity = float(order_data['quantity'])
-        self.price = float(order_data['price'])
-        self.order_type = order_data.get('type', 'limit')
-        self.status = 'pending'
-        self.strategy = order_data.get('strategy', 'unknown')
-        self.created_at = datetime.now()
+    __slots__ = (
+        'order_id', 'account_id', 'ticker', 'side', 'quantity', 'price', 'order_type',
+        'status', 'strategy', 'strategy_ref', 'created_at', 'filled_quantity', 'remaining_quantity',
+        'metadata'
+    )
+    
+    def __init__(self, order_data: OrderRequest):
+        self.metadata = {}
+        self._reset(order_data)
+    
+    def _reset(self, order_data: OrderRequest):
+        """按订单请求重置所有字段，对象池复用时调用"""
+        self.order_id = 0  # 由交易引擎在提交时分配
+        self.account_id = order_data.account_id
+        self.ticker = order_data.ticker
+        self.side = order_data.side  # 'buy' or 'sell'
+        self.quantity = float(order_data.quantity)
+        self.price = float(order_data.price)
+        self.order_type = order_data.type
+        self.status = STATUS_PENDING
+        self.strategy = order_data.strategy
+        self.strategy_ref: Optional[BaseStrategy] = None  # 提交时解析的策略对象
+        self.created_at = time.time_ns()  # 纳秒时间戳
         self.filled_quantity = 0.0
         self.remaining_quantity = self.quantity
-        self.metadata = order_data.get('metadata', {})
+        self.metadata.clear()
 
 class TradingEngine:
     """交易引擎"""
@@ -36,33 +59,62 @@ class TradingEngine:
         self.account_manager = AccountManager(config)
         self.strategies: Dict[str, BaseStrategy] = {}
         self.clients: Dict[str, AsyncRESTClient] = {}
-        self.orders: Dict[str, Order] = {}
+        self.orders: Dict[int, Order] = {}
+        # 递增订单ID，以启动时的纳秒时间为起点，避免重启后与已保存订单冲突
+        self._next_order_id = time.time_ns()
+        # 未结束订单（submitted/partial）的ID，避免每次扫描全部订单
+        self._open_order_ids: Set[int] = set()
+        # 订单统计，在订单登记和状态变化时增量维护
+        self._stats = {'total': 0, 'filled': 0, 'by_strategy': Counter(), 'by_status': Counter()}
+        # 已结束订单的对象池，减少下单路径上的对象分配
+        self._order_pool: deque = deque(maxlen=ORDER_POOL_SIZE)
         self.market_data: Dict[str, Any] = {}
         
         self.logger = logging.getLogger("trading_engine")
         self.is_running = False
         
+        # 引擎参数
+        engine_config = config.get('trading_engine', {})
+        self._market_data_interval = engine_config.get('market_data_interval', 1)
+        self._order_check_interval = engine_config.get('order_check_interval', 2)
+        self._strategy_interval = engine_config.get('strategy_interval', 10)
+        # 限制同时向交易所发出的查询数量
+        self._request_semaphore = asyncio.Semaphore(engine_config.get('max_concurrent_requests', 10))
+        
         # 回调函数
         self.order_update_callbacks: List[Callable] = []
         
         # 初始化客户端
         self._initialize_clients()
+        
+        # 每个账户一个有界下单队列，由独立任务按顺序提交
+        submit_queue_size = engine_config.get('submit_queue_size', 1024)
+        self._submit_queues: Dict[str, asyncio.Queue] = {
+            account_id: asyncio.Queue(maxsize=submit_queue_size) for account_id in self.clients
+        }
+        self._submit_tasks: List[asyncio.Task] = []
     
     def _initialize_clients(self):
         """初始化交易客户端"""
+        # 凭证按账户区分，HTTP连接池所有账户共用，停止时统一关闭
+        self._http_session = httpx.AsyncClient()
+        # 客户端构造时自建的会话未发出过请求，替换后在启动时关闭
+        self._idle_sessions: List[httpx.AsyncClient] = []
         for account in self.account_manager.get_active_accounts():
             client = AsyncRESTClient({
                 "base_url": "https://api.etherealtest.net",
                 "api_key": account.api_key,
                 "api_secret": account.api_secret
             })
+            self._idle_sessions.append(client.session)
+            client.session = self._http_session
             self.clients[account.account_id] = client
-            self.logger.info(f"初始化客户端: {account.account_id}")
+            self.logger.info("初始化客户端: %s", account.account_id)
     
     def add_strategy(self, strategy: BaseStrategy):
         """添加交易策略"""
         self.strategies[strategy.name] = strategy
-        self.logger.info(f"添加策略: {strategy.name}")
+        self.logger.info("添加策略: %s", strategy.name)
     
     def add_order_update_callback(self, callback: Callable):
         """添加订单更新回调"""
@@ -73,39 +125,88 @@ class TradingEngine:
         self.is_running = True
         self.logger.info("交易引擎启动")
         
+        await self._close_idle_sessions()
+        
         # 启动所有策略
         for strategy in self.strategies.values():
             await strategy.start()
         
+        # 启动下单任务
+        self._submit_tasks = [
+            asyncio.create_task(self._submit_worker(queue)) for queue in self._submit_queues.values()
+        ]
+        
+        # 先获取一次市场数据，保证策略首次执行时已有行情
+        await self._update_market_data()
+        
         # 启动主循环
-        await asyncio.gather(
-            self._market_data_loop(),
-            self._strategy_execution_loop(),
-            self._order_management_loop()
-        )
+        await self._run_scheduler()
     
     async def stop(self):
         """停止交易引擎"""
         self.is_running = False
         self.logger.info("交易引擎停止")
         
+        # 停止下单任务，丢弃尚未提交的订单
+        for task in self._submit_tasks:
+            task.cancel()
+        discarded = 0
+        for queue in self._submit_queues.values():
+            while not queue.empty():
+                queue.get_nowait()
+                discarded += 1
+        if discarded:
+            self.logger.warning("引擎停止，丢弃 %d 笔未提交订单", discarded)
+        
         # 停止所有策略
         for strategy in self.strategies.values():
             await strategy.stop()
         
-        # 关闭所有客户端
-        for client in self.clients.values():
-            await client.close()
+        # 关闭共用的HTTP会话
+        await self._close_idle_sessions()
+        await self._http_session.aclose()
+    
+    async def _close_idle_sessions(self):
+        """关闭客户端被替换下来的会话"""
+        sessions, self._idle_sessions = self._idle_sessions, []
+        for session in sessions:
+            await session.aclose()
     
-    async def _market_data_loop(self):
-        """市场数据循环"""
+    async def _run_scheduler(self):
+        """主调度循环：按截止时间依次执行行情更新、策略和订单检查"""
+        # (周期纳秒, 任务, 任务名称)
+        jobs = [
+            (int(self._market_data_interval * 1e9), self._update_market_data, "市场数据更新"),
+            (int(self._order_check_interval * 1e9), self._update_order_status, "订单管理"),
+        ]
+        strategy_period = int(self._strategy_interval * 1e9)
+        jobs.extend((strategy_period, partial(self._execute_strategy, strategy), f"策略 {name} 执行")
+                    for name, strategy in self.strategies.items())
+        
+        now = time.monotonic_ns()
+        deadlines = [(now + jobs[0][0], 0)] + [(now, index) for index in range(1, len(jobs))]
+        # 启动时已获取过一次行情，行情任务从下一周期开始，其余任务立即执行
+        heapq.heapify(deadlines)
+        
         while self.is_running:
+            deadline, index = deadlines[0]
+            delay = deadline - time.monotonic_ns()
+            if delay > 0:
+                await asyncio.sleep(delay / 1e9)
+                continue
+            
+            period, job, job_name = jobs[index]
+            # 执行超时时从当前时间重新计时，避免连续补跑
+            next_deadline = deadline + period
+            now = time.monotonic_ns()
+            if next_deadline < now:
+                next_deadline = now + period
+            heapq.heapreplace(deadlines, (next_deadline, index))
+            
             try:
-                await self._update_market_data()
-                await asyncio.sleep(1)  # 每秒更新一次
+                await job()
             except Exception as e:
-                self.logger.error(f"市场数据更新错误: {e}")
-                await asyncio.sleep(5)
+                self.logger.error("%s错误: %s", job_name, e)
     
     async def _update_market_data(self):
         """更新市场数据"""
@@ -118,68 +219,94 @@ class TradingEngine:
         try:
             # 获取所有产品信息
             products = await client.list_products()
+            timestamp = time.time_ns()
             
+            market_data = self.market_data
             for product in products:
                 ticker = product.ticker
+                # 每个产品的行情字典只创建一次，之后原地更新
+                data = market_data.get(ticker)
+                if data is None:
+                    data = market_data[ticker] = {}
                 # 这里应该获取实时价格，目前使用模拟数据
-                self.market_data[ticker] = {
-                    'price': 1.0,  # 模拟价格
-                    'volume': 0.0,
-                    'timestamp': datetime.now()
-                }
+                data['price'] = 1.0  # 模拟价格
+                data['volume'] = 0.0
+                data['timestamp'] = timestamp
         except Exception as e:
-            self.logger.error(f"获取市场数据失败: {e}")
-    
-    async def _strategy_execution_loop(self):
-        """策略执行循环"""
-        while self.is_running:
-            try:
-                # 并行执行所有策略
-                strategy_tasks = []
-                for strategy in self.strategies.values():
-                    if strategy.is_running:
-                        task = asyncio.create_task(self._execute_strategy(strategy))
-                        strategy_tasks.append(task)
-                
-                if strategy_tasks:
-                    await asyncio.gather(*strategy_tasks, return_exceptions=True)
-                
-                await asyncio.sleep(self.config.get('strategy_interval', 10))
-            except Exception as e:
-                self.logger.error(f"策略执行错误: {e}")
-                await asyncio.sleep(5)
+            self.logger.error("获取市场数据失败: %s", e)
     
     async def _execute_strategy(self, strategy: BaseStrategy):
         """执行单个策略"""
+        if not strategy.is_running:
+            return
+        
         try:
             # 策略生成订单
             orders = await strategy.execute(self.market_data)
             
-            # 处理生成的订单
+            if not orders:
+                return
+            
+            # 按账户分组，放入对应账户的下单队列
+            queues = self._submit_queues
+            batches: Dict[str, List[OrderRequest]] = {}
             for order_data in orders:
-                await self._submit_order(order_data)
+                account_id = order_data.account_id or "default"
+                if account_id not in queues:
+                    # 无对应客户端，直接走下单流程记录失败原因
+                    await self._submit_order(order_data)
+                    continue
+                batches.setdefault(account_id, []).append(order_data)
+            
+            # 同一批订单（如对冲的两条腿）要么全部入队，要么全部丢弃，避免单边成交
+            for account_id, batch in batches.items():
+                queue = queues[account_id]
+                if queue.maxsize and queue.maxsize - queue.qsize() < len(batch):
+                    self.logger.warning("账户 %s 下单队列已满，丢弃策略 %s 本轮 %d 笔订单",
+                                        account_id, strategy.name, sum(map(len, batches.values())))
+                    return
+            for account_id, batch in batches.items():
+                queue = queues[account_id]
+                for order_data in batch:
+                    queue.put_nowait(order_data)
         
         except Exception as e:
-            self.logger.error(f"策略 {strategy.name} 执行错误: {e}")
+            self.logger.error("策略 %s 执行错误: %s", strategy.name, e)
     
-    async def _submit_order(self, order_data: Dict[str, Any]):
+    async def _submit_worker(self, queue: asyncio.Queue):
+        """按顺序提交单个账户队列中的订单"""
+        while True:
+            order_data = await queue.get()
+            await self._submit_order(order_data)
+            queue.task_done()
+    
+    async def _submit_order(self, order_data: OrderRequest):
         """提交订单"""
         try:
-            # 创建订单对象
-            order = Order(order_data)
+            # 创建订单对象，优先复用对象池
+            if self._order_pool:
+                order = self._order_pool.pop()
+                order._reset(order_data)
+            else:
+                order = Order(order_data)
+            order.order_id = self._next_order_id
+            self._next_order_id += 1
+            order.strategy_ref = self.strategies.get(order.strategy)
             
             # 风险检查
             account_id = order.account_id or "default"
             if not self.account_manager.check_risk_limits(
                 account_id, order.quantity, order.ticker
             ):
-                self.logger.warning(f"订单风险检查失败: {order.order_id}")
+                self.logger.warning("订单风险检查失败: %s", order.order_id)
+                self._order_pool.append(order)
                 return
             
             # 获取对应的客户端
             client = self.clients.get(account_id)
             if not client:
-                self.logger.error(f"账户 {account_id} 客户端不存在")
+                self.logger.error("账户 %s 客户端不存在", account_id)
+                self._order_pool.append(order)
                 return
             
             # 提交订单到交易所
@@ -188,76 +315,112 @@ class TradingEngine:
                 # exchange_order = await client.create_order(...)
                 
                 # 模拟订单提交成功
-                order.status = 'submitted'
-                self.orders[order.order_id] = order
+                order.status = STATUS_SUBMITTED
+                self._register_order(order)
                 
-                self.logger.info(f"订单提交成功: {order.order_id} {order.ticker} {order.side} {order.quantity}")
+                self.logger.info("订单提交成功: %s %s %s %s", order.order_id, order.ticker, order.side, order.quantity)
                 
                 # 通知策略订单更新
                 await self._notify_order_update(order)
                 
             except Exception as e:
-                self.logger.error(f"订单提交失败: {e}")
-                order.status = 'failed'
+                self.logger.error("订单提交失败: %s", e)
+                if order.order_id in self.orders:
+                    # 已登记的订单需同步移出订单表并更新统计
+                    self._set_order_status(order, STATUS_FAILED)
+                else:
+                    order.status = STATUS_FAILED
                 await self._notify_order_update(order)
+                # 此时订单已不在订单表中，可以回收
+                self._order_pool.append(order)
         
         except Exception as e:
-            self.logger.error(f"订单处理错误: {e}")
-    
-    async def _order_management_loop(self):
-        """订单管理循环"""
-        while self.is_running:
-            try:
-                await self._update_order_status()
-                await asyncio.sleep(2)  # 每2秒检查一次
-            except Exception as e:
-                self.logger.error(f"订单管理错误: {e}")
-                await asyncio.sleep(5)
+            self.logger.error("订单处理错误: %s", e)
     
     async def _update_order_status(self):
         """更新订单状态"""
-        # 检查所有待处理订单
-        for order in list(self.orders.values()):
-            if order.status in ['submitted', 'partial']:
-                try:
-                    # 这里应该查询实际订单状态
-                    # 模拟订单成交
-                    if order.status == 'submitted':
-                        order.status = 'filled'
-                        order.filled_quantity = order.quantity
-                        order.remaining_quantity = 0
-                        
-                        await self._notify_order_update(order)
-                        
-                except Exception as e:
-                    self.logger.error(f"更新订单状态失败: {order.order_id}, {e}")
+        # 只检查待处理订单，并发查询
+        if self._open_order_ids:
+            orders = self.orders
+            await asyncio.gather(*(self._refresh_order_status(orders[oid]) for oid in self._open_order_ids))
+    
+    async def _refresh_order_status(self, order: Order):
+        """查询并更新单个订单状态"""
+        try:
+            # 信号量只限制向交易所的查询，状态更新和通知不占用名额
+            async with self._request_semaphore:
+                # 这里应该查询实际订单状态
+                # exchange_order = await client.get_order(...)
+                pass
+            
+            # 模拟订单成交
+            if order.status == STATUS_SUBMITTED:
+                self._set_order_status(order, STATUS_FILLED)
+                order.filled_quantity = order.quantity
+                order.remaining_quantity = 0
+                
+                await self._notify_order_update(order)
+                # 通知完成后订单不再被引用，回收到对象池
+                self._order_pool.append(order)
+                
+        except Exception as e:
+            self.logger.error("更新订单状态失败: %s, %s", order.order_id, e)
+    
+    def _register_order(self, order: Order):
+        """登记已提交订单"""
+        self.orders[order.order_id] = order
+        self._open_order_ids.add(order.order_id)
+        
+        stats = self._stats
+        stats['total'] += 1
+        stats['by_strategy'][order.strategy] += 1
+        stats['by_status'][order.status] += 1
+    
+    def _set_order_status(self, order: Order, status: int):
+        """更新订单状态并维护未结束订单集合和统计"""
+        if status in TERMINAL_STATUSES:
+            # 终结订单只保留统计，不再留在订单表中
+            self._open_order_ids.discard(order.order_id)
+            del self.orders[order.order_id]
+        
+        by_status = self._stats['by_status']
+        by_status[order.status] -= 1
+        by_status[status] += 1
+        if status == STATUS_FILLED:
+            self._stats['filled'] += 1
+        order.status = status
     
     async def _notify_order_update(self, order: Order):
         """通知订单更新"""
         order_update = {
-            'order_id': order.order_id,
+            'order_id': str(order.order_id),
             'account_id': order.account_id,
             'ticker': order.ticker,
             'side': order.side,
             'quantity': order.quantity,
             'filled_quantity': order.filled_quantity,
             'price': order.price,
-            'status': order.status,
+            'status': STATUS_NAMES[order.status],
             'strategy': order.strategy,
-            'timestamp': datetime.now()
+            'timestamp': time.time_ns()
         }
         
-        # 通知对应策略
-        strategy = self.strategies.get(order.strategy)
-        if strategy:
-            await strategy.on_order_update(order_update)
-        
-        # 调用回调函数
+        # 通知对应策略和回调函数，并发执行
+        handlers = []
         for callback in self.order_update_callbacks:
             try:
-                await callback(order_update)
+                handlers.append(callback(order_update))
             except Exception as e:
-                self.logger.error(f"订单更新回调错误: {e}")
+                # 回调在返回协程前同步抛出的异常
+                self.logger.error("订单更新回调错误: %s", e)
+        strategy = order.strategy_ref
+        if strategy:
+            handlers.append(strategy.on_order_update(order_update))
+        
+        results = await asyncio.gather(*handlers, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                self.logger.error("订单更新回调错误: %s", result)
     
     def get_strategy_status(self) -> Dict[str, Any]:
         """获取策略状态"""
@@ -272,13 +435,14 @@ class TradingEngine:
     
     def get_order_statistics(self) -> Dict[str, Any]:
         """获取订单统计"""
-        total_orders = len(self.orders)
-        filled_orders = sum(1 for order in self.orders.values() if order.status == 'filled')
+        stats = self._stats
+        total_orders = stats['total']
+        filled_orders = stats['filled']
         
         return {
             'total_orders': total_orders,
             'filled_orders': filled_orders,
             'fill_rate': filled_orders / total_orders if total_orders > 0 else 0,
-            'orders_by_strategy': {},
-            'orders_by_status': {}
+            'orders_by_strategy': dict(stats['by_strategy']),
+            'orders_by_status': {STATUS_NAMES[status]: count for status, count in stats['by_status'].items() if count}
         }
\ No newline at end of file